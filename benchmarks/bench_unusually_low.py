@@ -0,0 +1,46 @@
+"""Benchmark ``RideStats.is_unusually_low`` in flat and hourly modes.
+
+Flat detection recomputes the mean and stdev over the whole five-day history
+on every call, so its cost grows with the number of samples. Hourly detection
+reads one precomputed hour-of-week bucket and stays constant (with very few
+samples per hour it falls back to the flat statistics)::
+
+    python benchmarks/bench_unusually_low.py
+"""
+from __future__ import annotations
+
+import os
+import sys
+import timeit
+from datetime import UTC, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from disneywaits.stats import RideStats
+
+
+def build(detection: str, samples: int) -> RideStats:
+    stats = RideStats(detection=detection)
+    # Spread samples evenly over the five-day window.
+    now = datetime.now(UTC)
+    step = timedelta(days=5) / samples
+    start = now - step * (samples - 1)
+    for i in range(samples):
+        stats.add_wait(10 + (i * 7) % 50, start + step * i)
+    return stats
+
+
+def main() -> None:
+    number = 200
+    print(f"{'samples':>8} {'flat (us)':>12} {'hourly (us)':>12}")
+    for samples in (100, 1_000, 10_000, 50_000):
+        timings = []
+        for detection in ("flat", "hourly"):
+            stats = build(detection, samples)
+            seconds = timeit.timeit(stats.is_unusually_low, number=number)
+            timings.append(seconds / number * 1e6)
+        print(f"{samples:>8} {timings[0]:>12.1f} {timings[1]:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
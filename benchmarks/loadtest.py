@@ -0,0 +1,213 @@
+"""End-to-end load test against the offline queue-times stand-in.
+
+Starts :mod:`benchmarks.standin` and the real service as subprocesses, then
+drives concurrent ``/wait_times`` readers and ``/events`` subscribers while
+the service polls the stand-in, and reports latency percentiles for reads,
+stream connects and event delivery (emit to receipt). Run from the
+repository root::
+
+    python -m benchmarks.loadtest --parks 50 --readers 20 --subscribers 100
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence
+
+import httpx
+
+from .standin import add_arguments
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(samples: Sequence[float], pct: float) -> float | None:
+    """Return the ``pct`` percentile of ``samples`` using nearest rank."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class LoadResult:
+    read_latencies: List[float] = field(default_factory=list)
+    read_errors: int = 0
+    connect_latencies: List[float] = field(default_factory=list)
+    delivery_latencies: List[float] = field(default_factory=list)
+    subscriber_errors: int = 0
+    events: int = 0
+
+    def report(self) -> str:
+        lines = []
+        for label, samples in (
+            ("/wait_times", self.read_latencies),
+            ("/events connect", self.connect_latencies),
+            ("/events delivery", self.delivery_latencies),
+        ):
+            stats = " ".join(
+                f"p{pct}={_ms(percentile(samples, pct))}" for pct in (50, 90, 99)
+            )
+            lines.append(f"{label}: n={len(samples)} {stats} max={_ms(max(samples, default=None))}")
+        lines.append(
+            f"errors: /wait_times={self.read_errors} /events={self.subscriber_errors}"
+        )
+        lines.append(f"events received: {self.events}")
+        return "\n".join(lines)
+
+
+def _ms(value: float | None) -> str:
+    return "-" if value is None else f"{value * 1000:.1f}ms"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def _process(args: List[str], env: Dict[str, str] | None = None) -> Iterator[None]:
+    proc = subprocess.Popen([sys.executable, *args], env=env, cwd=ROOT)
+    try:
+        yield
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:  # pragma: no cover - stuck child
+            proc.kill()
+
+
+async def _wait_until_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                resp = await client.get(url)
+                if resp.status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{url} did not become ready")
+            await asyncio.sleep(0.2)
+
+
+async def _reader(client: httpx.AsyncClient, url: str, stop: float, result: LoadResult) -> None:
+    while time.monotonic() < stop:
+        start = time.perf_counter()
+        try:
+            resp = await client.get(url)
+            resp.raise_for_status()
+        except httpx.HTTPError:
+            result.read_errors += 1
+            continue
+        result.read_latencies.append(time.perf_counter() - start)
+
+
+async def _subscriber(client: httpx.AsyncClient, url: str, stop: float, result: LoadResult) -> None:
+    start = time.perf_counter()
+    try:
+        async with client.stream("GET", url, timeout=None) as resp:
+            resp.raise_for_status()
+            result.connect_latencies.append(time.perf_counter() - start)
+            lines = resp.aiter_lines()
+            while True:
+                remaining = stop - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    line = await asyncio.wait_for(lines.__anext__(), remaining)
+                except (asyncio.TimeoutError, StopAsyncIteration):
+                    break
+                if line.startswith("data:"):
+                    _record_event(json.loads(line[len("data:"):]), result)
+    except httpx.HTTPError:
+        result.subscriber_errors += 1
+
+
+def _record_event(data: dict, result: LoadResult) -> None:
+    result.events += 1
+    emitted = data.get("timestamp")
+    if emitted is not None:
+        delay = datetime.now(UTC) - datetime.fromisoformat(emitted)
+        result.delivery_latencies.append(delay.total_seconds())
+
+
+async def drive(
+    base_url: str, readers: int, subscribers: int, duration: float
+) -> LoadResult:
+    """Run readers and subscribers against ``base_url`` for ``duration`` seconds."""
+    result = LoadResult()
+    stop = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=readers + subscribers + 10)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        await asyncio.gather(
+            *(_reader(client, "/wait_times", stop, result) for _ in range(readers)),
+            *(_subscriber(client, "/events", stop, result) for _ in range(subscribers)),
+        )
+    return result
+
+
+def main() -> None:  # pragma: no cover - command line entry point
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=10)
+    parser.add_argument("--subscribers", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--poll-interval", type=float, default=5)
+    parser.add_argument("--poll-workers", type=int, default=0)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    standin_port = _free_port()
+    app_port = _free_port()
+    standin_url = f"http://127.0.0.1:{standin_port}"
+    app_url = f"http://127.0.0.1:{app_port}"
+    standin_args = [
+        "-m", "benchmarks.standin", "--port", str(standin_port), "--log-level", "warning",
+        "--parks", str(args.parks),
+        "--lands-per-park", str(args.lands_per_park),
+        "--rides-per-land", str(args.rides_per_land),
+        "--area-depth", str(args.area_depth),
+        "--latency", str(args.latency),
+        "--error-rate", str(args.error_rate),
+        "--padding", str(args.padding),
+        "--seed", str(args.seed),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DISNEYWAITS_QUEUE_TIMES_URL=standin_url,
+            DISNEYWAITS_POLL_INTERVAL=str(args.poll_interval),
+            DISNEYWAITS_POLL_WORKERS=str(args.poll_workers),
+            DISNEYWAITS_DATA_PATH=str(Path(tmp) / "data.json"),
+        )
+        app_args = [
+            "-m", "uvicorn", "disneywaits.service:app",
+            "--port", str(app_port), "--log-level", "warning",
+        ]
+        with _process(standin_args), _process(app_args, env):
+            asyncio.run(_wait_until_ready(standin_url + "/parks.json"))
+            asyncio.run(_wait_until_ready(app_url + "/parks"))
+            result = asyncio.run(
+                drive(app_url, args.readers, args.subscribers, args.duration)
+            )
+    print(result.report())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
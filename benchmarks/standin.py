@@ -0,0 +1,197 @@
+"""Offline stand-in for the queue-times API, for local load testing.
+
+Serves ``/parks.json`` and ``/parks/{id}/queue_times.json`` with synthetic
+parks whose rides are nested under lands and areas. Run it with::
+
+    python -m benchmarks.standin --port 8001 --parks 50 --latency 0.2
+
+and point the service at it with ``DISNEYWAITS_QUEUE_TIMES_URL``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, HTTPException
+
+GROUP_NAME = "Walt Disney Attractions"
+
+
+@dataclass
+class StandInConfig:
+    parks: int = 10
+    lands_per_park: int = 6
+    rides_per_land: int = 8
+    # Extra levels of ``areas`` between a land and its rides.
+    area_depth: int = 1
+    # Mean response delay in seconds; each response varies by +/-50%.
+    latency: float = 0.0
+    # Fraction of requests answered with HTTP 500.
+    error_rate: float = 0.0
+    # Bytes of filler added to every ride to inflate the payload.
+    padding: int = 0
+    seed: int = 0
+
+
+@dataclass
+class _Ride:
+    id: int
+    name: str
+    base: float
+    noise: float = 0.0
+    closed_until: float = 0.0
+
+
+@dataclass
+class _Park:
+    id: int
+    name: str
+    lands: List[List[_Ride]] = field(default_factory=list)
+
+
+class StandIn:
+    """Synthetic queue-times data with plausible wait dynamics.
+
+    Each ride has a base popularity scaled by a time-of-day curve that peaks
+    in the early afternoon, plus mean-reverting noise carried between polls.
+    Rides occasionally close for a while, and waits are reported in
+    five-minute steps like the real API.
+    """
+
+    def __init__(self, config: StandInConfig) -> None:
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.parks: Dict[int, _Park] = {}
+        ride_id = 1
+        for park_id in range(1, config.parks + 1):
+            park = _Park(id=park_id, name=f"Park {park_id}")
+            for _ in range(config.lands_per_park):
+                land = []
+                for _ in range(config.rides_per_land):
+                    base = self.random.lognormvariate(3.2, 0.6)
+                    land.append(_Ride(id=ride_id, name=f"Ride {ride_id}", base=base))
+                    ride_id += 1
+                park.lands.append(land)
+            self.parks[park_id] = park
+
+    def parks_payload(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": 1,
+                "name": GROUP_NAME,
+                "parks": [{"id": p.id, "name": p.name} for p in self.parks.values()],
+            }
+        ]
+
+    def queue_times_payload(self, park_id: int, now: float | None = None) -> Dict[str, Any]:
+        park = self.parks[park_id]
+        now = time.time() if now is None else now
+        clock = datetime.fromtimestamp(now, UTC)
+        hour = clock.hour + clock.minute / 60
+        crowd = max(0.1, math.sin(math.pi * (hour - 8) / 14)) if 8 <= hour <= 22 else 0.1
+        lands = []
+        for index, land in enumerate(park.lands):
+            rides = [self._ride_payload(ride, crowd, now) for ride in land]
+            node: Dict[str, Any] = {"rides": rides}
+            for _ in range(self.config.area_depth):
+                node = {"areas": [node]}
+            lands.append({"id": index + 1, "name": f"Land {index + 1}", **node})
+        return {"lands": lands, "rides": []}
+
+    def _ride_payload(self, ride: _Ride, crowd: float, now: float) -> Dict[str, Any]:
+        ride.noise = 0.8 * ride.noise + self.random.gauss(0, 0.15)
+        if ride.closed_until <= now and self.random.random() < 0.005:
+            ride.closed_until = now + self.random.uniform(600, 3600)
+        is_open = ride.closed_until <= now
+        wait = 0
+        if is_open:
+            wait = int(round(max(0.0, ride.base * crowd * (1 + ride.noise)) / 5) * 5)
+        data: Dict[str, Any] = {
+            "id": ride.id,
+            "name": ride.name,
+            "is_open": is_open,
+            "wait_time": wait,
+            "last_updated": datetime.fromtimestamp(now, UTC).isoformat(),
+        }
+        if self.config.padding:
+            data["padding"] = "x" * self.config.padding
+        return data
+
+    async def respond(self) -> None:
+        """Apply the configured latency and error rate to a request."""
+        if self.config.latency:
+            await asyncio.sleep(self.config.latency * self.random.uniform(0.5, 1.5))
+        if self.random.random() < self.config.error_rate:
+            raise HTTPException(status_code=500, detail="synthetic failure")
+
+
+def create_app(config: StandInConfig | None = None) -> FastAPI:
+    standin = StandIn(config or StandInConfig())
+    app = FastAPI()
+    app.state.standin = standin
+
+    @app.get("/parks.json")
+    async def parks() -> List[Dict[str, Any]]:
+        await standin.respond()
+        return standin.parks_payload()
+
+    @app.get("/parks/{park_id}/queue_times.json")
+    async def queue_times(park_id: int) -> Dict[str, Any]:
+        await standin.respond()
+        if park_id not in standin.parks:
+            raise HTTPException(status_code=404, detail="unknown park")
+        return standin.queue_times_payload(park_id)
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = StandInConfig()
+    parser.add_argument("--parks", type=int, default=defaults.parks)
+    parser.add_argument("--lands-per-park", type=int, default=defaults.lands_per_park)
+    parser.add_argument("--rides-per-land", type=int, default=defaults.rides_per_land)
+    parser.add_argument("--area-depth", type=int, default=defaults.area_depth)
+    parser.add_argument("--latency", type=float, default=defaults.latency)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--padding", type=int, default=defaults.padding)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args: argparse.Namespace) -> StandInConfig:
+    return StandInConfig(
+        parks=args.parks,
+        lands_per_park=args.lands_per_park,
+        rides_per_land=args.rides_per_land,
+        area_depth=args.area_depth,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        padding=args.padding,
+        seed=args.seed,
+    )
+
+
+def main() -> None:  # pragma: no cover - command line entry point
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--log-level", default="info")
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(config_from_args(args)),
+        host=args.host,
+        port=args.port,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
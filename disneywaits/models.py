@@ -0,0 +1,21 @@
+"""Park and ride records shared by the service and storage backends."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict
+
+from .stats import RideStats
+
+
+@dataclass
+class RideInfo:
+    id: int | str
+    name: str
+    stats: RideStats = field(default_factory=RideStats)
+
+
+@dataclass
+class ParkInfo:
+    id: int | str
+    name: str
+    rides: Dict[int | str, RideInfo] = field(default_factory=dict)
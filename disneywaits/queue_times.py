@@ -1,27 +1,100 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
-from typing import Any, Dict, List
+from concurrent.futures import Executor
+from typing import Any, Dict, Iterable, Iterator, List
 
 import httpx
 
-PARKS_URL = "https://queue-times.com/parks.json"
-PARK_QUEUE_URL = "https://queue-times.com/parks/{park_id}/queue_times.json"
+try:  # pragma: no cover - optional speedup
+    import orjson
+except ImportError:  # pragma: no cover - fall back to the stdlib decoder
+    orjson = None
+
+QUEUE_TIMES_URL = "https://queue-times.com"
+PARKS_URL = QUEUE_TIMES_URL + "/parks.json"
+PARK_QUEUE_URL = QUEUE_TIMES_URL + "/parks/{park_id}/queue_times.json"
+
+DEFAULT_PARK_GROUPS = ("Walt Disney Attractions",)
+
+# Payloads larger than this (in bytes) are decoded off the event loop.
+OFFLOAD_THRESHOLD = 256 * 1024
 
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+def decode_json(content: bytes) -> Any:
+    """Decode a JSON payload, using ``orjson`` when it is installed."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def iter_rides(node: Any) -> Iterator[Dict[str, Any]]:
+    """Yield rides from a queue-times payload in document order.
+
+    Rides may be nested arbitrarily deep under ``lands`` and ``areas``; the
+    tree is walked with an explicit stack so no intermediate lists are built.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get("rides"), list):
+                yield from node["rides"]
+            children = []
+            for key in ("lands", "areas"):
+                children.extend(node.get(key, []) or [])
+            stack.extend(reversed(children))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def parse_rides(content: bytes) -> List[Dict[str, Any]]:
+    """Decode a ``queue_times.json`` payload and return its flattened rides."""
+    return list(iter_rides(decode_json(content)))
+
+
 class QueueTimesClient:
-    """HTTP client for the queue-times API."""
+    """HTTP client for the queue-times API.
+
+    Wait time payloads larger than ``offload_threshold`` bytes are decoded
+    and flattened in ``executor`` (the loop's default thread pool when
+    ``None``). A thread still contends for the GIL, so this bounds event
+    loop latency spikes rather than removing the CPU cost; pass a
+    ``ProcessPoolExecutor`` (ideally with a ``forkserver`` context) to move
+    decoding out of the process entirely.
+
+    ``park_groups`` names the queue-times operator groups to track and
+    ``park_ids`` adds individual parks from any group. ``base_url`` points
+    the client at another host serving the same API, such as the offline
+    stand-in in ``benchmarks/standin.py``.
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        offload_threshold: int = OFFLOAD_THRESHOLD,
+        executor: Executor | None = None,
+        park_groups: Iterable[str] = DEFAULT_PARK_GROUPS,
+        park_ids: Iterable[int | str] = (),
+        base_url: str = QUEUE_TIMES_URL,
+    ) -> None:
         self.client = httpx.AsyncClient(headers={"User-Agent": "DisneyWaits/1.0"})
+        base_url = base_url.rstrip("/")
+        self.parks_url = PARKS_URL.replace(QUEUE_TIMES_URL, base_url, 1)
+        self.park_queue_url = PARK_QUEUE_URL.replace(QUEUE_TIMES_URL, base_url, 1)
+        self.park_groups = set(park_groups)
+        self.park_ids = {str(park_id) for park_id in park_ids}
+        self.offload_threshold = offload_threshold
+        self.executor = executor
 
     async def fetch_parks(self) -> List[Dict[str, Any]]:
-        """Return parks under the "Walt Disney Attractions" group."""
-        resp = await self.client.get(PARKS_URL)
+        """Return parks in the configured groups or with a configured id."""
+        resp = await self.client.get(self.parks_url)
         resp.raise_for_status()
         data = resp.json()
         groups: List[Dict[str, Any]]
@@ -30,38 +103,35 @@ class QueueTimesClient:
         else:
             groups = data
         logger.debug("QueueTimes returned %d park groups", len(groups))
+        parks: List[Dict[str, Any]] = []
+        found_groups = set()
         for group in groups:
-            if group.get("name") == "Walt Disney Attractions":
-                parks = group.get("parks", [])
-                logger.info("Found %d Disney parks", len(parks))
-                return parks
-        logger.warning("Walt Disney Attractions group not found in parks list")
-        return []
+            in_group = group.get("name") in self.park_groups
+            if in_group:
+                found_groups.add(group.get("name"))
+            for park in group.get("parks", []):
+                if in_group or str(park.get("id")) in self.park_ids:
+                    parks.append(park)
+        for name in sorted(self.park_groups - found_groups):
+            logger.warning("%s group not found in parks list", name)
+        logger.info("Found %d parks", len(parks))
+        return parks
 
     async def fetch_wait_times(self, park_id: int | str) -> List[Dict[str, Any]]:
         """Fetch and flatten all ride wait times for a park."""
-        url = PARK_QUEUE_URL.format(park_id=park_id)
+        url = self.park_queue_url.format(park_id=park_id)
         resp = await self.client.get(url)
         resp.raise_for_status()
-        data = resp.json()
-
-        def _collect(node: Any) -> List[Dict[str, Any]]:
-            rides: List[Dict[str, Any]] = []
-            if isinstance(node, dict):
-                if isinstance(node.get("rides"), list):
-                    rides.extend(node["rides"])
-                for key in ("lands", "areas"):
-                    for child in node.get(key, []) or []:
-                        rides.extend(_collect(child))
-            elif isinstance(node, list):
-                for child in node:
-                    rides.extend(_collect(child))
-            return rides
-
-        rides = _collect(data)
-        logger.debug(
-            "Flattened rides for park %s: %s", park_id, [r.get("name") for r in rides]
-        )
+        content = resp.content
+        if len(content) > self.offload_threshold:
+            loop = asyncio.get_running_loop()
+            rides = await loop.run_in_executor(self.executor, parse_rides, content)
+        else:
+            rides = parse_rides(content)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Flattened rides for park %s: %s", park_id, [r.get("name") for r in rides]
+            )
         if not rides:
             logger.warning("No rides found for park %s", park_id)
         else:
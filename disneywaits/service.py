@@ -3,118 +3,127 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import multiprocessing
+import os
+import time
 from collections import deque
-from dataclasses import dataclass, field
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import UTC, datetime
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, Deque, Dict, List, Set, Tuple
 
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
 from sse_starlette.sse import EventSourceResponse
 from pathlib import Path
 
-from .queue_times import QueueTimesClient
-from .stats import RideStats, WaitEntry
+from .models import ParkInfo, RideInfo
+from .queue_times import DEFAULT_PARK_GROUPS, QUEUE_TIMES_URL, QueueTimesClient
+from .sharding import ShardedPoller
+from .stats import DETECTION_MODES, RideStats
+from .storage import JsonStorage, Sample, SqliteStorage, Storage
 
 
-@dataclass
-class RideInfo:
-    id: int | str
-    name: str
-    stats: RideStats = field(default_factory=RideStats)
-
-
-@dataclass
-class ParkInfo:
-    id: int | str
-    name: str
-    rides: Dict[int | str, RideInfo] = field(default_factory=dict)
+# Number of recent events kept for replay to reconnecting SSE clients.
+EVENT_BUFFER_SIZE = 1000
 
 
 class DisneyWaitsService:
-    def __init__(self, client: QueueTimesClient, data_path: Path | None = None) -> None:
+    def __init__(
+        self,
+        client: QueueTimesClient,
+        data_path: Path | None = None,
+        compress_history: bool = False,
+        detection_mode: str = "flat",
+        event_buffer_size: int = EVENT_BUFFER_SIZE,
+        poller: ShardedPoller | None = None,
+        storage: Storage | None = None,
+    ) -> None:
+        if detection_mode not in DETECTION_MODES:
+            raise ValueError(f"unknown detection mode: {detection_mode!r}")
         self.client = client
+        self.poller = poller
+        self.compress_history = compress_history
+        self.detection_mode = detection_mode
         self.parks: Dict[int | str, ParkInfo] = {}
         self.data_path = data_path or Path(__file__).with_name("data.json")
+        self.storage = storage or JsonStorage(self.data_path)
         self._subscribers: List[Tuple[asyncio.Queue, Set[str]]] = []
+        # Event ids are "<epoch>-<seq>"; the epoch changes on every start so a
+        # client resuming across a restart gets a snapshot, not unrelated events.
+        self._event_epoch = format(time.time_ns(), "x")
+        self._event_seq = 0
+        self._events: Deque[Tuple[int, dict]] = deque(maxlen=event_buffer_size)
 
     # ------------------ Persistence helpers ------------------
     def save(self) -> None:
-        """Write current park data to disk."""
-        data: Dict[str, Any] = {}
-        for park_id, park in self.parks.items():
-            park_data: Dict[str, Any] = {"id": park.id, "name": park.name, "rides": {}}
-            for ride_id, ride in park.rides.items():
-                stats = ride.stats
-                ride_data = {
-                    "id": ride.id,
-                    "name": ride.name,
-                    "stats": {
-                        "history": [
-                            {"timestamp": entry.timestamp.isoformat(), "wait": entry.wait}
-                            for entry in stats.history
-                        ],
-                        "current_wait": stats.current_wait,
-                        "is_open": stats.is_open,
-                        "recently_opened": stats.recently_opened,
-                    },
-                }
-                park_data["rides"][ride_id] = ride_data
-            data[park_id] = park_data
-
-        self.data_path.parent.mkdir(parents=True, exist_ok=True)
-        self.data_path.write_text(json.dumps(data))
+        """Write current park data to storage."""
+        self.storage.save(self.parks)
 
     def load(self) -> None:
-        """Load park data from disk if available."""
-        if not self.data_path.exists():
-            return
-        raw = json.loads(self.data_path.read_text())
-        parks: Dict[int | str, ParkInfo] = {}
-        for park_id, pdata in raw.items():
-            park = ParkInfo(id=pdata["id"], name=pdata["name"])
-            for ride_id, rdata in pdata.get("rides", {}).items():
-                sdata = rdata.get("stats", {})
-                stats = RideStats()
-                stats.history = deque(
-                    WaitEntry(datetime.fromisoformat(e["timestamp"]), e["wait"])
-                    for e in sdata.get("history", [])
-                )
-                stats.current_wait = sdata.get("current_wait")
-                stats.is_open = sdata.get("is_open", True)
-                stats.recently_opened = sdata.get("recently_opened", False)
-                ride = RideInfo(id=rdata["id"], name=rdata["name"], stats=stats)
-                park.rides[ride_id] = ride
-            parks[park_id] = park
+        """Load park data from storage if available."""
+        parks = self.storage.load()
+        for park in parks.values():
+            for ride in park.rides.values():
+                ride.stats.set_detection(self.detection_mode)
+                ride.stats.set_compress(self.compress_history)
         self.parks = parks
 
+    def _new_stats(self, compress: bool) -> RideStats:
+        return RideStats(compress=compress, detection=self.detection_mode)
+
     async def update(self) -> None:
         logger.info("Refreshing park data")
         parks_data = await self.client.fetch_parks()
         logger.info("Received %d parks from QueueTimes", len(parks_data))
         if not parks_data:
             logger.warning("No parks returned from QueueTimes")
+        parks: List[ParkInfo] = []
         for park in parks_data:
             park_id = str(park.get("id") or park.get("slug"))
             park_name = park.get("name")
-            park_info = self.parks.setdefault(park_id, ParkInfo(id=park_id, name=park_name))
-            await self._update_park(park_info)
+            parks.append(self.parks.setdefault(park_id, ParkInfo(id=park_id, name=park_name)))
+        samples: List[Sample] = []
+        if self.poller is None:
+            for park_info in parks:
+                samples.extend(await self._update_park(park_info))
+        else:
+            rides_by_park = await self.poller.fetch_wait_times(p.id for p in parks)
+            for park_info in parks:
+                rides = rides_by_park.get(str(park_info.id))
+                if rides is None:
+                    logger.warning("No wait times fetched for park %s", park_info.id)
+                    continue
+                samples.extend(self._record_rides(park_info, rides))
+        await asyncio.to_thread(self.storage.record, samples)
 
-    async def _update_park(self, park: ParkInfo) -> None:
+    async def _update_park(self, park: ParkInfo) -> List[Sample]:
         rides = await self.client.fetch_wait_times(park.id)
+        return self._record_rides(park, rides)
+
+    def _record_rides(self, park: ParkInfo, rides: List[Dict[str, Any]]) -> List[Sample]:
+        """Apply a park's rides to its state and return the recorded samples."""
         logger.info("Updating %s (%s) with %d rides", park.name, park.id, len(rides))
         if not rides:
             logger.warning("No rides found for park %s", park.id)
         timestamp = datetime.now(UTC)
+        samples: List[Sample] = []
         for ride in rides:
             ride_id = str(ride.get("id"))
             name = ride.get("name")
             wait = ride.get("wait_time")
             is_open = ride.get("is_open", True) and ride.get("status", "") not in {"Closed", "Refurbishment"}
-            ride_info = park.rides.setdefault(ride_id, RideInfo(id=ride_id, name=name))
+            ride_info = park.rides.get(ride_id)
+            if ride_info is None:
+                ride_info = RideInfo(
+                    id=ride_id, name=name, stats=self._new_stats(self.compress_history)
+                )
+                park.rides[ride_id] = ride_info
             if is_open and wait is not None:
                 ride_info.stats.mark_open()
                 ride_info.stats.add_wait(wait, timestamp)
+                samples.append(
+                    (str(park.id), park.name, ride_id, ride_info.name, timestamp, wait)
+                )
                 logger.debug("Recorded wait %s for ride %s", wait, name)
                 if ride_info.stats.recently_opened:
                     self._notify(ride_id, "opened", ride_info)
@@ -123,6 +132,7 @@ class DisneyWaitsService:
             else:
                 ride_info.stats.mark_closed()
                 logger.debug("Skipping ride %s (open=%s wait=%s)", name, is_open, wait)
+        return samples
 
     def wait_times(
         self,
@@ -164,27 +174,87 @@ class DisneyWaitsService:
                 results.append(entry)
         return results
 
-    def subscribe(self, ride_ids: Set[str]) -> asyncio.Queue:
+    def subscribe(self, ride_ids: Set[str], last_event_id: str | None = None) -> asyncio.Queue:
+        """Register a subscriber for ride events.
+
+        When ``last_event_id`` is given, buffered events newer than it are
+        queued first. If some of the missed events are no longer buffered, or
+        the id comes from an earlier process, a single ``snapshot`` event is
+        queued instead, telling the client to re-fetch ``/wait_times``.
+        """
         queue: asyncio.Queue = asyncio.Queue()
+        if last_event_id is not None:
+            epoch, _, seq = last_event_id.partition("-")
+            last_seq = int(seq) if epoch == self._event_epoch and seq.isdigit() else None
+            oldest = self._events[0][0] if self._events else self._event_seq + 1
+            if last_seq is None or last_seq > self._event_seq or last_seq < oldest - 1:
+                queue.put_nowait({"id": self._event_id(), "event": "snapshot"})
+            else:
+                for event_seq, data in self._events:
+                    if event_seq > last_seq and (not ride_ids or data["ride_id"] in ride_ids):
+                        queue.put_nowait(data)
         self._subscribers.append((queue, ride_ids))
         return queue
 
     def unsubscribe(self, queue: asyncio.Queue) -> None:
         self._subscribers = [s for s in self._subscribers if s[0] is not queue]
 
+    def _event_id(self) -> str:
+        return f"{self._event_epoch}-{self._event_seq}"
+
     def _notify(self, ride_id: str, event: str, ride: RideInfo) -> None:
+        self._event_seq += 1
         data = {
+            "id": self._event_id(),
             "ride_id": ride_id,
             "ride_name": ride.name,
             "event": event,
             "wait": ride.stats.current_wait,
+            "timestamp": datetime.now(UTC).isoformat(),
         }
+        self._events.append((self._event_seq, data))
         for queue, ids in list(self._subscribers):
             if not ids or ride_id in ids:
                 queue.put_nowait(data)
 
-client = QueueTimesClient()
-service = DisneyWaitsService(client)
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").lower() in {"1", "true", "yes"}
+
+
+def _env_list(name: str) -> List[str]:
+    return [item.strip() for item in os.environ.get(name, "").split(",") if item.strip()]
+
+
+_base_url = os.environ.get("DISNEYWAITS_QUEUE_TIMES_URL", QUEUE_TIMES_URL)
+_poll_workers = int(os.environ.get("DISNEYWAITS_POLL_WORKERS", "0"))
+POLL_INTERVAL = float(os.environ.get("DISNEYWAITS_POLL_INTERVAL", "300"))
+
+_decode_executor: Executor | None = None
+if _env_flag("DISNEYWAITS_DECODE_PROCESSES"):
+    # forkserver avoids forking the already multithreaded server process.
+    _decode_executor = ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("forkserver")
+    )
+
+client = QueueTimesClient(
+    park_groups=_env_list("DISNEYWAITS_PARK_GROUPS") or DEFAULT_PARK_GROUPS,
+    park_ids=_env_list("DISNEYWAITS_PARK_IDS"),
+    base_url=_base_url,
+    executor=_decode_executor,
+)
+_data_path = os.environ.get("DISNEYWAITS_DATA_PATH")
+_storage: Storage | None = None
+if os.environ.get("DISNEYWAITS_STORAGE", "json") == "sqlite":
+    _storage = SqliteStorage(_data_path or Path(__file__).with_name("data.db"))
+service = DisneyWaitsService(
+    client,
+    data_path=Path(_data_path) if _data_path else None,
+    storage=_storage,
+    compress_history=_env_flag("DISNEYWAITS_COMPRESS_HISTORY"),
+    detection_mode=os.environ.get("DISNEYWAITS_DETECTION", "flat"),
+    poller=ShardedPoller(_poll_workers, base_url=_base_url) if _poll_workers > 0 else None,
+)
 app = FastAPI()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -204,7 +274,7 @@ async def startup() -> None:
                 await service.update()
             except Exception:  # pragma: no cover - log and continue
                 logger.exception("Failed to update wait times")
-            await asyncio.sleep(300)
+            await asyncio.sleep(POLL_INTERVAL)
 
     asyncio.create_task(poller())
 
@@ -212,7 +282,12 @@ async def startup() -> None:
 @app.on_event("shutdown")
 async def shutdown() -> None:
     service.save()
+    service.storage.close()
     await client.close()
+    if _decode_executor is not None:
+        _decode_executor.shutdown(wait=False)
+    if service.poller is not None:
+        service.poller.close()
 
 
 @app.get("/parks")
@@ -252,9 +327,14 @@ async def wait_times_endpoint(
 
 
 @app.get("/events")
-async def events(request: Request, ride_ids: str | None = None) -> EventSourceResponse:
+async def events(
+    request: Request, ride_ids: str | None = None, last_event_id: str | None = None
+) -> EventSourceResponse:
     ids = set(ride_ids.split(",")) if ride_ids else set()
-    queue = service.subscribe(ids)
+    # Browsers send Last-Event-ID only on automatic reconnects; the query
+    # parameter lets the dashboard resume after opening a new stream.
+    resume_from = request.headers.get("last-event-id") or last_event_id or None
+    queue = service.subscribe(ids, resume_from)
 
     async def event_generator():
         try:
@@ -262,7 +342,7 @@ async def events(request: Request, ride_ids: str | None = None) -> EventSourceRe
                 if await request.is_disconnected():
                     break
                 data = await queue.get()
-                yield {"event": data["event"], "data": json.dumps(data)}
+                yield {"id": data["id"], "event": data["event"], "data": json.dumps(data)}
         finally:
             service.unsubscribe(queue)
 
@@ -1,26 +1,103 @@
 from __future__ import annotations
 
+import math
 import statistics
 from collections import deque
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
-from typing import Deque, List, Tuple
+from typing import Deque, Dict, List, Tuple
+
+DETECTION_MODES = ("flat", "hourly")
+
+# Samples older than this count half as much towards an hourly baseline.
+BASELINE_HALF_LIFE = timedelta(weeks=4)
+# Hourly baselines with less weight than this fall back to the flat stats.
+BASELINE_MIN_WEIGHT = 3.0
 
 
 @dataclass
 class WaitEntry:
     timestamp: datetime
     wait: int
+    duration: timedelta = timedelta(0)
+    count: int = 1
+
+    @property
+    def end(self) -> datetime:
+        """Timestamp of the last sample folded into this entry."""
+        return self.timestamp + self.duration
+
+
+@dataclass
+class BaselineBucket:
+    """Exponentially decayed wait accumulators for one hour of the week."""
+
+    weight: float = 0.0
+    total: float = 0.0
+    total_sq: float = 0.0
+    updated: float = 0.0
+
+    def add(self, wait: int, when: float) -> None:
+        if self.weight:
+            decay = 0.5 ** ((when - self.updated) / BASELINE_HALF_LIFE.total_seconds())
+            decay = min(decay, 1.0)
+            self.weight *= decay
+            self.total *= decay
+            self.total_sq *= decay
+        self.weight += 1
+        self.total += wait
+        self.total_sq += wait * wait
+        self.updated = max(self.updated, when)
+
+    def mean(self) -> float:
+        return self.total / self.weight
+
+    def stdev(self) -> float | None:
+        if self.weight <= 1:
+            return None
+        variance = (self.total_sq - self.total * self.total / self.weight) / (self.weight - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+def hour_of_week(timestamp: datetime) -> int:
+    """Return the UTC hour of the week, 0 (Monday 00:00) to 167."""
+    timestamp = timestamp.astimezone(UTC)
+    return timestamp.weekday() * 24 + timestamp.hour
 
 
 class RideStats:
-    """Track wait time statistics for a single ride."""
+    """Track wait time statistics for a single ride.
+
+    With ``compress=True`` consecutive identical waits are stored as a single
+    :class:`WaitEntry` covering the whole run and the mean/stdev are weighted
+    by the time each run was observed. Runs end when the ride closes.
 
-    def __init__(self) -> None:
+    Every sample also updates a decayed accumulator for its hour of the week.
+    With ``detection="hourly"`` :meth:`is_unusually_low` compares the current
+    wait with that hour's baseline in constant time instead of with the flat
+    five-day statistics.
+    """
+
+    def __init__(self, compress: bool = False, detection: str = "flat") -> None:
+        self.set_detection(detection)
+        self._weights_cache: List[float] | None = None
         self.history: Deque[WaitEntry] = deque()
+        self.compress = compress
+        self.baseline: Dict[int, BaselineBucket] = {}
+        self.last_sample: datetime | None = None
         self.current_wait: int | None = None
         self.is_open: bool = True
         self.recently_opened: bool = False
+        self._run_closed = False
+
+    @property
+    def history(self) -> Deque[WaitEntry]:
+        return self._history
+
+    @history.setter
+    def history(self, history: Deque[WaitEntry]) -> None:
+        self._history = history
+        self._weights_cache = None
 
     def add_wait(self, wait: int, timestamp: datetime | None = None) -> None:
         """Add a wait time sample.
@@ -29,10 +106,61 @@ class RideStats:
         """
         timestamp = timestamp or datetime.now(UTC)
         self.current_wait = wait
-        self.history.append(WaitEntry(timestamp, wait))
+        self.last_sample = timestamp
+        bucket = self.baseline.setdefault(hour_of_week(timestamp), BaselineBucket())
+        bucket.add(wait, timestamp.timestamp())
+        last = self.history[-1] if self.history else None
+        if self.compress and not self._run_closed and last is not None and last.wait == wait:
+            last.duration = max(last.duration, timestamp - last.timestamp)
+            last.count += 1
+        else:
+            self.history.append(WaitEntry(timestamp, wait))
+        self._weights_cache = None
+        self._run_closed = False
         self._trim_history(timestamp)
 
+    def set_detection(self, detection: str) -> None:
+        """Select the :meth:`is_unusually_low` mode, one of ``DETECTION_MODES``."""
+        if detection not in DETECTION_MODES:
+            raise ValueError(f"unknown detection mode: {detection!r}")
+        self.detection = detection
+
+    def set_compress(self, compress: bool) -> None:
+        """Switch history mode, converting the stored history to match.
+
+        Turning compression on merges adjacent identical waits sampled within
+        twice the usual polling interval of each other; turning it
+        off expands each run back into evenly spaced samples.
+        """
+        if compress == self.compress:
+            return
+        entries = list(self.history)
+        self.history = deque()
+        if compress:
+            interval = self._typical_interval(entries)
+            for entry in entries:
+                last = self.history[-1] if self.history else None
+                if (
+                    last is not None
+                    and last.wait == entry.wait
+                    and entry.timestamp - last.end <= interval * 2
+                ):
+                    last.duration = entry.end - last.timestamp
+                    last.count += entry.count
+                else:
+                    self.history.append(
+                        WaitEntry(entry.timestamp, entry.wait, entry.duration, entry.count)
+                    )
+        else:
+            for entry in entries:
+                step = entry.duration / (entry.count - 1) if entry.count > 1 else timedelta(0)
+                for i in range(entry.count):
+                    self.history.append(WaitEntry(entry.timestamp + step * i, entry.wait))
+        self.compress = compress
+        self._weights_cache = None
+
     def mark_closed(self) -> None:
+        self._run_closed = True
         self.is_open = False
         self.current_wait = None
         self.recently_opened = False
@@ -43,26 +171,151 @@ class RideStats:
 
     def _trim_history(self, now: datetime) -> None:
         cutoff = now - timedelta(days=5)
-        while self.history and self.history[0].timestamp < cutoff:
+        while self.history and self.history[0].end < cutoff:
             self.history.popleft()
+            self._weights_cache = None
+        first = self.history[0] if self.history else None
+        if first is not None and first.timestamp < cutoff:
+            # Keep only the samples of a partially expired run that fall
+            # inside the window, assuming they were evenly spaced.
+            end = first.end
+            step = first.duration / (first.count - 1)
+            remaining = int((end - cutoff) / step) + 1
+            first.timestamp = end - step * (remaining - 1)
+            first.duration = end - first.timestamp
+            first.count = remaining
+            self._weights_cache = None
+
+    def _sample_count(self) -> int:
+        return sum(entry.count for entry in self.history)
+
+    @staticmethod
+    def _typical_interval(entries: List[WaitEntry]) -> timedelta:
+        """Return the median spacing between consecutive samples."""
+        gaps: List[Tuple[timedelta, int]] = []
+        for entry in entries:
+            if entry.count > 1:
+                gaps.append((entry.duration / (entry.count - 1), entry.count - 1))
+        for cur, nxt in zip(entries, entries[1:]):
+            gaps.append((nxt.timestamp - cur.end, 1))
+        if not gaps:
+            return timedelta(0)
+        gaps.sort()
+        half = sum(n for _, n in gaps) / 2
+        seen = 0
+        for gap, n in gaps:
+            seen += n
+            if seen >= half:
+                return gap
+        return gaps[-1][0]  # pragma: no cover - loop always returns
+
+    def _weights(self) -> List[float]:
+        """Return per-entry weights, scaled so they sum to the sample count.
+
+        In compressed mode each run is weighted by the time until the next run
+        starts, capped at its own span plus one typical polling interval so
+        closures and missed polls do not inflate the run before them.  For
+        evenly spaced samples this reduces to the sample count of each run,
+        so results match the uncompressed statistics.  The result is cached
+        until the history changes.
+        """
+        if self._weights_cache is None:
+            self._weights_cache = self._compute_weights()
+        return self._weights_cache
+
+    def _compute_weights(self) -> List[float]:
+        counts = [float(entry.count) for entry in self.history]
+        total = sum(counts)
+        if not self.compress or total < 2:
+            return counts
+        entries = list(self.history)
+        interval = self._typical_interval(entries).total_seconds()
+        if interval <= 0:
+            return counts
+        durations = [
+            min(
+                (nxt.timestamp - cur.timestamp).total_seconds(),
+                cur.duration.total_seconds() + interval,
+            )
+            for cur, nxt in zip(entries, entries[1:])
+        ]
+        durations.append(entries[-1].duration.total_seconds() + interval)
+        scale = total / sum(durations)
+        return [d * scale for d in durations]
+
+    def _weighted(self) -> Tuple[List[float], List[int]]:
+        return self._weights(), [entry.wait for entry in self.history]
 
     def mean(self) -> float | None:
         if not self.history:
             return None
-        return statistics.mean(entry.wait for entry in self.history)
+        if not self.compress:
+            return statistics.mean(entry.wait for entry in self.history)
+        weights, waits = self._weighted()
+        return math.fsum(w * x for w, x in zip(weights, waits)) / math.fsum(weights)
 
     def stdev(self) -> float | None:
-        if len(self.history) < 2:
+        if not self.compress:
+            if len(self.history) < 2:
+                return None
+            return statistics.stdev(entry.wait for entry in self.history)
+        if self._sample_count() < 2:
+            return None
+        weights, waits = self._weighted()
+        total = math.fsum(weights)
+        mean = math.fsum(w * x for w, x in zip(weights, waits)) / total
+        variance = math.fsum(w * (x - mean) ** 2 for w, x in zip(weights, waits))
+        return math.sqrt(variance / (total - 1))
+
+    def rebuild_baseline(self, since: datetime | None = None) -> None:
+        """Recompute the hourly baseline from the stored history.
+
+        With ``since`` the existing baseline is kept and only samples newer
+        than it are added, e.g. ones recorded after the baseline was saved.
+        """
+        if since is None:
+            self.baseline = {}
+        for entry in self.history:
+            step = entry.duration / (entry.count - 1) if entry.count > 1 else timedelta(0)
+            for i in range(entry.count):
+                timestamp = entry.timestamp + step * i
+                if since is not None and timestamp <= since:
+                    continue
+                bucket = self.baseline.setdefault(hour_of_week(timestamp), BaselineBucket())
+                bucket.add(entry.wait, timestamp.timestamp())
+        if self.history:
+            self.last_sample = max(self.history[-1].end, since or self.history[-1].end)
+        elif since is None:
+            self.last_sample = None
+
+    def hourly_baseline(self) -> Tuple[float, float | None] | None:
+        """Return the mean and stdev for the hour of the latest sample.
+
+        Returns None until that hour has at least ``BASELINE_MIN_WEIGHT``
+        worth of samples.
+        """
+        if self.last_sample is None:
+            return None
+        bucket = self.baseline.get(hour_of_week(self.last_sample))
+        if bucket is None or bucket.weight < BASELINE_MIN_WEIGHT:
             return None
-        return statistics.stdev(entry.wait for entry in self.history)
+        return bucket.mean(), bucket.stdev()
 
     def is_unusually_low(self) -> bool:
-        """Return True if current wait is >1 std dev below mean."""
+        """Return True if current wait is >1 std dev below mean.
+
+        In ``hourly`` mode the mean and stdev come from the baseline for the
+        current hour of the week, falling back to the flat statistics while
+        that hour has too few samples.
+        """
         if self.current_wait is None:
             return False
-        mean = self.mean()
-        stdev = self.stdev()
+        baseline = self.hourly_baseline() if self.detection == "hourly" else None
+        if baseline is not None:
+            mean, stdev = baseline
+        else:
+            mean = self.mean()
+            stdev = self.stdev()
         if mean is None or stdev is None or stdev == 0:
             return False
         return self.current_wait < mean - stdev
-
@@ -0,0 +1,270 @@
+"""Storage backends used by :class:`~disneywaits.service.DisneyWaitsService`.
+
+:class:`JsonStorage` keeps everything in a single JSON file. :class:`SqliteStorage`
+appends every poll cycle's samples to an indexed SQLite table and only loads
+the rolling window needed for live statistics; older samples stay queryable
+with :meth:`SqliteStorage.history`.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .models import ParkInfo, RideInfo
+from .stats import BaselineBucket, RideStats, WaitEntry
+
+# (park_id, park_name, ride_id, ride_name, timestamp, wait) for one sample.
+Sample = Tuple[str, str, str, str, datetime, int]
+
+# History needed to rebuild the live five-day statistics.
+LIVE_WINDOW = timedelta(days=5)
+
+
+def _entry_to_dict(entry: WaitEntry) -> Dict[str, Any]:
+    data: Dict[str, Any] = {"timestamp": entry.timestamp.isoformat(), "wait": entry.wait}
+    if entry.count > 1:
+        data["duration"] = entry.duration.total_seconds()
+        data["count"] = entry.count
+    return data
+
+
+def _entry_from_dict(data: Dict[str, Any]) -> WaitEntry:
+    return WaitEntry(
+        datetime.fromisoformat(data["timestamp"]),
+        data["wait"],
+        timedelta(seconds=data.get("duration", 0)),
+        data.get("count", 1),
+    )
+
+
+def _state_to_dict(stats: RideStats) -> Dict[str, Any]:
+    """Serialise everything about ``stats`` except its history."""
+    return {
+        "compress": stats.compress,
+        "baseline": {
+            str(hour): [b.weight, b.total, b.total_sq, b.updated]
+            for hour, b in stats.baseline.items()
+        },
+        "last_sample": stats.last_sample.isoformat() if stats.last_sample else None,
+        "current_wait": stats.current_wait,
+        "is_open": stats.is_open,
+        "recently_opened": stats.recently_opened,
+    }
+
+
+def _stats_from_dict(data: Dict[str, Any], history: Iterable[WaitEntry]) -> RideStats:
+    stats = RideStats(compress=data.get("compress", False))
+    stats.history = deque(history)
+    if "baseline" in data:
+        stats.baseline = {
+            int(hour): BaselineBucket(*values) for hour, values in data["baseline"].items()
+        }
+        last_sample = data.get("last_sample")
+        stats.last_sample = datetime.fromisoformat(last_sample) if last_sample else None
+    else:
+        stats.rebuild_baseline()
+    stats.current_wait = data.get(
+        "current_wait", stats.history[-1].wait if stats.history else None
+    )
+    stats.is_open = data.get("is_open", True)
+    stats.recently_opened = data.get("recently_opened", False)
+    return stats
+
+
+class Storage(ABC):
+    """Interface for persisting park state between runs."""
+
+    @abstractmethod
+    def save(self, parks: Dict[int | str, ParkInfo]) -> None:
+        """Persist the current state of ``parks``."""
+
+    @abstractmethod
+    def load(self) -> Dict[int | str, ParkInfo]:
+        """Return the saved parks, or an empty dict when nothing is saved."""
+
+    def record(self, samples: List[Sample]) -> None:
+        """Store the samples from one poll cycle. Optional for backends."""
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class JsonStorage(Storage):
+    """Store all parks, including full history, in one JSON file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def save(self, parks: Dict[int | str, ParkInfo]) -> None:
+        data: Dict[str, Any] = {}
+        for park_id, park in parks.items():
+            park_data: Dict[str, Any] = {"id": park.id, "name": park.name, "rides": {}}
+            for ride_id, ride in park.rides.items():
+                stats = ride.stats
+                park_data["rides"][ride_id] = {
+                    "id": ride.id,
+                    "name": ride.name,
+                    "stats": {
+                        "history": [_entry_to_dict(entry) for entry in stats.history],
+                        **_state_to_dict(stats),
+                    },
+                }
+            data[park_id] = park_data
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(data))
+
+    def load(self) -> Dict[int | str, ParkInfo]:
+        if not self.path.exists():
+            return {}
+        raw = json.loads(self.path.read_text())
+        parks: Dict[int | str, ParkInfo] = {}
+        for park_id, pdata in raw.items():
+            park = ParkInfo(id=pdata["id"], name=pdata["name"])
+            for ride_id, rdata in pdata.get("rides", {}).items():
+                sdata = rdata.get("stats", {})
+                history = (_entry_from_dict(e) for e in sdata.get("history", []))
+                stats = _stats_from_dict(sdata, history)
+                park.rides[ride_id] = RideInfo(id=rdata["id"], name=rdata["name"], stats=stats)
+            parks[park_id] = park
+        return parks
+
+
+class SqliteStorage(Storage):
+    """Store samples in SQLite, indexed by ride and time.
+
+    Samples are appended once per poll cycle in a single transaction, along
+    with the ids and names of their parks and rides, so a crash loses at most
+    the per-ride state written by :meth:`save`; :meth:`load` rebuilds it from
+    the samples. :meth:`load` reads just the last ``window`` of samples.
+    """
+
+    def __init__(self, path: Path | str, window: timedelta = LIVE_WINDOW) -> None:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.window = window
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS parks (
+                    id TEXT PRIMARY KEY,
+                    name TEXT
+                );
+                CREATE TABLE IF NOT EXISTS rides (
+                    park_id TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    name TEXT,
+                    state TEXT NOT NULL,
+                    PRIMARY KEY (park_id, id)
+                );
+                CREATE TABLE IF NOT EXISTS waits (
+                    park_id TEXT NOT NULL,
+                    ride_id TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    wait INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS waits_ride_time ON waits (ride_id, timestamp);
+                CREATE INDEX IF NOT EXISTS waits_time ON waits (timestamp);
+                """
+            )
+
+    def record(self, samples: List[Sample]) -> None:
+        if not samples:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO parks (id, name) VALUES (?, ?)"
+                " ON CONFLICT (id) DO UPDATE SET name = excluded.name",
+                {(park_id, park_name) for park_id, park_name, *_ in samples},
+            )
+            self.conn.executemany(
+                "INSERT INTO rides (park_id, id, name, state) VALUES (?, ?, ?, '{}')"
+                " ON CONFLICT (park_id, id) DO UPDATE SET name = excluded.name",
+                {(park_id, ride_id, ride_name) for park_id, _, ride_id, ride_name, *_ in samples},
+            )
+            self.conn.executemany(
+                "INSERT INTO waits (park_id, ride_id, timestamp, wait) VALUES (?, ?, ?, ?)",
+                [
+                    (park_id, ride_id, timestamp.timestamp(), wait)
+                    for park_id, _, ride_id, _, timestamp, wait in samples
+                ],
+            )
+
+    def save(self, parks: Dict[int | str, ParkInfo]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO parks (id, name) VALUES (?, ?)",
+                [(str(park.id), park.name) for park in parks.values()],
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO rides (park_id, id, name, state) VALUES (?, ?, ?, ?)",
+                [
+                    (str(park.id), str(ride.id), ride.name, json.dumps(_state_to_dict(ride.stats)))
+                    for park in parks.values()
+                    for ride in park.rides.values()
+                ],
+            )
+
+    def load(self) -> Dict[int | str, ParkInfo]:
+        cutoff = (datetime.now(UTC) - self.window).timestamp()
+        history: Dict[Tuple[str, str], List[WaitEntry]] = {}
+        rows = self.conn.execute(
+            "SELECT park_id, ride_id, timestamp, wait FROM waits"
+            " WHERE timestamp >= ? ORDER BY timestamp",
+            (cutoff,),
+        )
+        for park_id, ride_id, timestamp, wait in rows:
+            entry = WaitEntry(datetime.fromtimestamp(timestamp, UTC), wait)
+            history.setdefault((park_id, ride_id), []).append(entry)
+
+        parks: Dict[int | str, ParkInfo] = {
+            park_id: ParkInfo(id=park_id, name=name)
+            for park_id, name in self.conn.execute("SELECT id, name FROM parks")
+        }
+        for park_id, ride_id, name, state in self.conn.execute(
+            "SELECT park_id, id, name, state FROM rides"
+        ):
+            park = parks.setdefault(park_id, ParkInfo(id=park_id, name=park_id))
+            data = json.loads(state)
+            # Samples are stored one per row; the service re-compresses them.
+            data["compress"] = False
+            stats = _stats_from_dict(data, history.pop((park_id, ride_id), []))
+            last_saved = stats.last_sample
+            if last_saved is not None and stats.history:
+                # Allow for float rounding of the stored timestamps.
+                last_saved += timedelta(milliseconds=1)
+            if last_saved is not None and stats.history and stats.history[-1].end > last_saved:
+                # Fold in samples recorded after the state was last saved.
+                stats.rebuild_baseline(since=last_saved)
+                stats.current_wait = stats.history[-1].wait
+                stats.is_open = True
+            park.rides[ride_id] = RideInfo(id=ride_id, name=name, stats=stats)
+        for (park_id, ride_id), entries in history.items():
+            # Samples written before ride rows were recorded with them.
+            park = parks.setdefault(park_id, ParkInfo(id=park_id, name=park_id))
+            stats = _stats_from_dict({}, entries)
+            park.rides[ride_id] = RideInfo(id=ride_id, name=ride_id, stats=stats)
+        return parks
+
+    def history(
+        self, ride_id: int | str, start: datetime, end: datetime | None = None
+    ) -> List[WaitEntry]:
+        """Return samples for ``ride_id`` between ``start`` and ``end``."""
+        end = end or datetime.now(UTC)
+        rows = self.conn.execute(
+            "SELECT timestamp, wait FROM waits"
+            " WHERE ride_id = ? AND timestamp >= ? AND timestamp < ? ORDER BY timestamp",
+            (str(ride_id), start.timestamp(), end.timestamp()),
+        )
+        return [WaitEntry(datetime.fromtimestamp(ts, UTC), wait) for ts, wait in rows]
+
+    def close(self) -> None:
+        self.conn.close()
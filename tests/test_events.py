@@ -3,7 +3,7 @@ import asyncio
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from disneywaits.service import DisneyWaitsService
+from disneywaits.service import DisneyWaitsService, RideInfo
 
 class OpeningClient:
     def __init__(self) -> None:
@@ -51,3 +51,52 @@ def test_service_notifies_on_low_wait():
     event = asyncio.run(queue.get())
     assert event["event"] == "unusually_low"
     assert event["ride_id"] == "10"
+
+
+def _emit(service, count, ride_id="10"):
+    ride = RideInfo(id=ride_id, name="Ride")
+    for _ in range(count):
+        service._notify(ride_id, "unusually_low", ride)
+
+
+def _id(service, seq):
+    return f"{service._event_epoch}-{seq}"
+
+
+def test_subscribe_replays_missed_events():
+    service = DisneyWaitsService(LowWaitClient())
+    _emit(service, 2)
+    _emit(service, 1, ride_id="11")
+    resumed = service.subscribe({"10"}, last_event_id=_id(service, 1))
+    event = asyncio.run(resumed.get())
+    assert event["id"] == _id(service, 2)
+    assert event["event"] == "unusually_low"
+    assert resumed.empty()
+    everything = service.subscribe(set(), last_event_id=_id(service, 1))
+    assert everything.qsize() == 2
+    assert service.subscribe({"10"}, last_event_id=_id(service, 3)).empty()
+    assert service.subscribe({"10"}).empty()
+
+
+def test_subscribe_sends_snapshot_when_gap_too_old():
+    service = DisneyWaitsService(LowWaitClient(), event_buffer_size=2)
+    _emit(service, 4)  # only events 3 and 4 remain buffered
+    replay = service.subscribe(set(), last_event_id=_id(service, 2))
+    assert asyncio.run(replay.get())["id"] == _id(service, 3)
+    stale = service.subscribe(set(), last_event_id=_id(service, 1))
+    assert asyncio.run(stale.get()) == {"id": _id(service, 4), "event": "snapshot"}
+    assert stale.empty()
+    garbage = service.subscribe(set(), last_event_id="nonsense")
+    assert asyncio.run(garbage.get())["event"] == "snapshot"
+
+
+def test_subscribe_sends_snapshot_after_restart():
+    old = DisneyWaitsService(LowWaitClient())
+    _emit(old, 5)
+    last_seen = _id(old, 5)
+    new = DisneyWaitsService(LowWaitClient())
+    new._event_epoch = old._event_epoch + "0"  # distinct epoch even on a coarse clock
+    _emit(new, 10)  # new process has already passed the client's sequence number
+    resumed = new.subscribe(set(), last_event_id=last_seen)
+    assert asyncio.run(resumed.get()) == {"id": _id(new, 10), "event": "snapshot"}
+    assert resumed.empty()
@@ -1,4 +1,5 @@
 import os, sys, asyncio
+from datetime import timedelta
 from pathlib import Path
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -29,3 +30,44 @@ def test_persistence(tmp_path: Path):
     assert len(waits) == 2
     ride_a = next(r for r in waits if r["id"] == "10")
     assert ride_a["current_wait"] == 5
+
+
+def test_persistence_compressed_history(tmp_path: Path):
+    data_path = tmp_path / "data.json"
+    service = DisneyWaitsService(DummyClient(), data_path=data_path, compress_history=True)
+    for _ in range(3):
+        asyncio.run(service.update())
+    stats = service.parks["1"].rides["10"].stats
+    assert len(stats.history) == 1
+    assert stats.history[0].count == 3
+    service.save()
+
+    new_service = DisneyWaitsService(DummyClient(), data_path=data_path, compress_history=True)
+    new_service.load()
+    loaded = new_service.parks["1"].rides["10"].stats
+    assert loaded.compress is True
+    assert loaded.history == stats.history
+
+
+def test_persistence_switches_history_mode(tmp_path: Path):
+    data_path = tmp_path / "data.json"
+    service = DisneyWaitsService(DummyClient(), data_path=data_path)
+    asyncio.run(service.update())
+    stats = service.parks["1"].rides["10"].stats
+    start = stats.history[0].timestamp
+    stats.add_wait(5, start + timedelta(minutes=5))
+    stats.add_wait(5, start + timedelta(minutes=10))
+    service.save()
+
+    packed = DisneyWaitsService(DummyClient(), data_path=data_path, compress_history=True)
+    packed.load()
+    stats = packed.parks["1"].rides["10"].stats
+    assert stats.compress is True
+    assert [(e.wait, e.count) for e in stats.history] == [(5, 3)]
+    packed.save()
+
+    plain = DisneyWaitsService(DummyClient(), data_path=data_path)
+    plain.load()
+    stats = plain.parks["1"].rides["10"].stats
+    assert stats.compress is False
+    assert [(e.wait, e.count) for e in stats.history] == [(5, 1)] * 3
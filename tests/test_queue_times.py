@@ -1,13 +1,16 @@
 import asyncio
+import json
 import os, sys
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from disneywaits.queue_times import QueueTimesClient
+from disneywaits.queue_times import QueueTimesClient, iter_rides
 
 class DummyResp:
     def __init__(self, data):
         self._data = data
+        self.content = json.dumps(data).encode()
     def json(self):
         return self._data
     def raise_for_status(self):
@@ -36,8 +39,8 @@ def test_fetch_parks_filters_wda(monkeypatch):
         {"id": 11, "name": "Epcot"},
     ]
 
-async def _fetch_waits(monkeypatch, payload):
-    client = QueueTimesClient()
+async def _fetch_waits(monkeypatch, payload, **kwargs):
+    client = QueueTimesClient(**kwargs)
     async def fake_get(url):
         return DummyResp(payload)
     monkeypatch.setattr(client.client, "get", fake_get)
@@ -69,3 +72,53 @@ def test_fetch_wait_times_flattens_nested(monkeypatch):
     }
     waits = asyncio.run(_fetch_waits(monkeypatch, payload))
     assert [r["id"] for r in waits] == [4, 5]
+
+
+def test_fetch_wait_times_offloads_large_payload(monkeypatch):
+    payload = {"lands": [{"rides": [{"id": i}]} for i in range(50)]}
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        waits = asyncio.run(
+            _fetch_waits(monkeypatch, payload, offload_threshold=0, executor=executor)
+        )
+    assert [r["id"] for r in waits] == list(range(50))
+
+
+def test_fetch_wait_times_offloads_to_default_executor(monkeypatch):
+    payload = {"lands": [{"rides": [{"id": 1}, {"id": 2}]}]}
+    waits = asyncio.run(_fetch_waits(monkeypatch, payload, offload_threshold=0))
+    assert [r["id"] for r in waits] == [1, 2]
+
+
+def test_iter_rides_preserves_order_and_handles_deep_nesting():
+    payload = [
+        {"rides": [{"id": 1}], "lands": [{"rides": [{"id": 2}]}], "areas": [{"rides": [{"id": 3}]}]},
+        {"rides": [{"id": 4}]},
+    ]
+    assert [r["id"] for r in iter_rides(payload)] == [1, 2, 3, 4]
+
+    deep = {"rides": [{"id": "bottom"}]}
+    for _ in range(5000):
+        deep = {"areas": [deep]}
+    assert [r["id"] for r in iter_rides(deep)] == ["bottom"]
+
+
+def test_fetch_parks_configurable_groups_and_ids(monkeypatch):
+    payload = [
+        {"name": "Other", "parks": [{"id": 1, "name": "Other Park"}, {"id": 2, "name": "Extra"}]},
+        {"name": "Universal Parks & Resorts", "parks": [{"id": 64, "name": "Islands"}]},
+        {"name": "Walt Disney Attractions", "parks": [{"id": 10, "name": "Magic Kingdom"}]},
+    ]
+
+    async def run():
+        client = QueueTimesClient(
+            park_groups=["Universal Parks & Resorts", "Walt Disney Attractions"],
+            park_ids=[2],
+        )
+        async def fake_get(url):
+            return DummyResp(payload)
+        monkeypatch.setattr(client.client, "get", fake_get)
+        parks = await client.fetch_parks()
+        await client.close()
+        return parks
+
+    assert [p["id"] for p in asyncio.run(run())] == [2, 64, 10]
@@ -174,3 +174,8 @@ def test_wait_times_endpoint():
     assert client.get("/wait_times", params={"stdev": ride["stdev"]}).json() == [ride]
     assert client.get("/wait_times", params={"recently_opened": "true"}).json() == [ride]
 
+
+
+def test_service_rejects_unknown_detection_mode():
+    with pytest.raises(ValueError):
+        DisneyWaitsService(DummyClient(), detection_mode="Hourly")
@@ -0,0 +1,40 @@
+import asyncio
+import os, sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from disneywaits.service import DisneyWaitsService
+from disneywaits.sharding import ShardedPoller, assign_shards
+
+
+class ShardClient:
+    async def fetch_wait_times(self, park_id):
+        if park_id == "3":
+            raise RuntimeError("boom")
+        return [{"id": f"{park_id}-1", "name": "Ride", "wait_time": 10, "pid": os.getpid()}]
+
+
+class ParksClient:
+    async def fetch_parks(self):
+        return [{"id": i, "name": f"Park {i}"} for i in range(1, 7)]
+
+
+def test_assign_shards_is_stable_and_balanced():
+    shards = assign_shards([5, 1, 4, 2, 3, "1"], 2)
+    assert shards == [["1", "3", "5"], ["2", "4"]]
+    assert assign_shards([1], 4) == [["1"]]
+
+
+def test_sharded_poller_merges_into_service():
+    poller = ShardedPoller(2, client_factory=ShardClient)
+    try:
+        service = DisneyWaitsService(ParksClient(), poller=poller)
+        asyncio.run(service.update())
+    finally:
+        poller.close()
+    assert set(service.parks) == {str(i) for i in range(1, 7)}
+    assert service.parks["3"].rides == {}
+    waits = service.wait_times("5")
+    assert [w["id"] for w in waits] == ["5-1"]
+    assert waits[0]["current_wait"] == 10
+    assert len(service.wait_times()) == 5
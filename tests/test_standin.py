@@ -0,0 +1,57 @@
+import os, sys
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.loadtest import LoadResult, _record_event, percentile
+from disneywaits.queue_times import QueueTimesClient, iter_rides
+from benchmarks.standin import StandIn, StandInConfig, create_app
+
+
+def test_standin_serves_nested_rides():
+    config = StandInConfig(parks=3, lands_per_park=2, rides_per_land=4, area_depth=3)
+    client = TestClient(create_app(config))
+    groups = client.get("/parks.json").json()
+    assert [p["id"] for p in groups[0]["parks"]] == [1, 2, 3]
+    payload = client.get("/parks/2/queue_times.json").json()
+    assert "areas" in payload["lands"][0]
+    rides = list(iter_rides(payload))
+    assert len(rides) == 8
+    assert all(r["wait_time"] % 5 == 0 for r in rides)
+    assert client.get("/parks/99/queue_times.json").status_code == 404
+
+
+def test_standin_error_rate_and_padding():
+    client = TestClient(create_app(StandInConfig(parks=1, error_rate=1.0)))
+    assert client.get("/parks.json").status_code == 500
+    standin = StandIn(StandInConfig(parks=1, rides_per_land=1, padding=100))
+    ride = next(iter_rides(standin.queue_times_payload(1)))
+    assert len(ride["padding"]) == 100
+
+
+def test_client_base_url():
+    client = QueueTimesClient(base_url="http://localhost:8001/")
+    assert client.parks_url == "http://localhost:8001/parks.json"
+    assert client.park_queue_url.format(park_id=5) == "http://localhost:8001/parks/5/queue_times.json"
+
+
+def test_percentile_and_report():
+    samples = [0.01 * i for i in range(1, 101)]
+    assert percentile(samples, 50) == 0.5
+    assert percentile(samples, 99) == 0.99
+    assert percentile([], 50) is None
+    report = LoadResult(read_latencies=samples).report()
+    assert "/wait_times: n=100 p50=500.0ms" in report
+    assert "/events connect: n=0 p50=-" in report
+
+
+def test_record_event_delivery_latency():
+    from datetime import UTC, datetime, timedelta
+
+    result = LoadResult()
+    emitted = datetime.now(UTC) - timedelta(seconds=2)
+    _record_event({"event": "opened", "timestamp": emitted.isoformat()}, result)
+    _record_event({"event": "snapshot"}, result)
+    assert result.events == 2
+    assert len(result.delivery_latencies) == 1
+    assert 2 <= result.delivery_latencies[0] < 10
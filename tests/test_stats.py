@@ -1,5 +1,7 @@
+from collections import deque
 from datetime import UTC, datetime, timedelta
 import os, sys
+import pytest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -32,3 +34,139 @@ def test_recently_opened_flag():
     assert stats.recently_opened is True
     stats.mark_open()
     assert stats.recently_opened is False
+
+
+def test_compressed_history_matches_uncompressed():
+    plain = RideStats()
+    packed = RideStats(compress=True)
+    start = datetime.now(UTC) - timedelta(hours=2)
+    waits = [10, 10, 10, 15, 15, 20, 10, 10, 5, 5, 5, 5]
+    for i, wait in enumerate(waits):
+        ts = start + timedelta(minutes=5 * i)
+        plain.add_wait(wait, ts)
+        packed.add_wait(wait, ts)
+    assert len(plain.history) == len(waits)
+    assert len(packed.history) == 5
+    assert packed.history[0].count == 3
+    assert packed.history[0].duration == timedelta(minutes=10)
+    assert packed.mean() == pytest.approx(plain.mean())
+    assert packed.stdev() == pytest.approx(plain.stdev())
+    assert packed.is_unusually_low() == plain.is_unusually_low()
+
+
+def test_compressed_history_ignores_overnight_closure():
+    plain = RideStats()
+    packed = RideStats(compress=True)
+    start = datetime.now(UTC) - timedelta(days=1)
+    samples = [(start + timedelta(minutes=5 * i), 20) for i in range(12)]
+    samples.append((start + timedelta(minutes=60), 90))
+    morning = start + timedelta(hours=13)
+    samples += [(morning + timedelta(minutes=5 * i), 20) for i in range(12)]
+    for stats in (plain, packed):
+        for ts, wait in samples:
+            if ts == morning:
+                stats.mark_closed()
+                stats.mark_open()
+            stats.add_wait(wait, ts)
+    assert len(packed.history) == 3
+    assert packed.mean() == pytest.approx(plain.mean())
+    assert packed.stdev() == pytest.approx(plain.stdev())
+
+
+def test_compressed_run_ends_on_close():
+    stats = RideStats(compress=True)
+    now = datetime.now(UTC)
+    stats.add_wait(10, now - timedelta(hours=12))
+    stats.mark_closed()
+    stats.mark_open()
+    stats.add_wait(10, now)
+    assert len(stats.history) == 2
+    assert stats.history[0].duration == timedelta(0)
+
+
+def test_set_compress_round_trip():
+    stats = RideStats()
+    start = datetime.now(UTC) - timedelta(hours=1)
+    for i, wait in enumerate([10, 10, 10, 15, 15]):
+        stats.add_wait(wait, start + timedelta(minutes=5 * i))
+    plain = list(stats.history)
+    stats.set_compress(True)
+    assert [(e.wait, e.count) for e in stats.history] == [(10, 3), (15, 2)]
+    stats.set_compress(False)
+    assert list(stats.history) == plain
+
+
+def test_compressed_history_trims_partial_run():
+    stats = RideStats(compress=True)
+    now = datetime.now(UTC)
+    start = now - timedelta(days=5, hours=1)
+    for i in range(25):
+        stats.add_wait(10, start + timedelta(minutes=5 * i))
+    stats.add_wait(20, now)
+    first = stats.history[0]
+    assert first.timestamp >= now - timedelta(days=5)
+    assert first.count == 13
+    assert first.end == start + timedelta(minutes=5 * 24)
+
+
+def test_hourly_detection_uses_time_of_day_baseline():
+    flat = RideStats()
+    hourly = RideStats(detection="hourly")
+    monday = datetime(2026, 10, 5, tzinfo=UTC)
+    for day in range(21):
+        for hour, wait in ((8, 5), (12, 60), (14, 60), (16, 60)):
+            for minute in (0, 20, 40):
+                ts = monday + timedelta(days=day, hours=hour, minutes=minute)
+                flat.add_wait(wait + minute // 20, ts)
+                hourly.add_wait(wait + minute // 20, ts)
+    morning = monday + timedelta(days=21, hours=8)
+    flat.add_wait(5, morning)
+    hourly.add_wait(5, morning)
+    assert flat.is_unusually_low()
+    assert not hourly.is_unusually_low()
+    mean, stdev = hourly.hourly_baseline()
+    assert 5 < mean < 6
+    assert stdev > 0
+    afternoon = morning + timedelta(hours=6)
+    hourly.add_wait(30, afternoon)
+    assert hourly.is_unusually_low()
+
+
+def test_hourly_detection_falls_back_to_flat():
+    stats = RideStats(detection="hourly")
+    now = datetime(2026, 10, 5, 12, tzinfo=UTC)
+    stats.add_wait(10, now - timedelta(hours=3))
+    stats.add_wait(12, now - timedelta(hours=2))
+    stats.add_wait(2, now)
+    assert stats.hourly_baseline() is None
+    assert stats.is_unusually_low()
+    with pytest.raises(ValueError):
+        RideStats(detection="weekly")
+
+
+def test_rebuild_baseline_matches_incremental():
+    stats = RideStats(compress=True)
+    start = datetime(2026, 10, 5, 9, tzinfo=UTC)
+    for i in range(30):
+        stats.add_wait(10 if i < 20 else 25, start + timedelta(minutes=5 * i))
+    incremental = {hour: bucket.weight for hour, bucket in stats.baseline.items()}
+    stats.rebuild_baseline()
+    assert {hour: b.weight for hour, b in stats.baseline.items()} == pytest.approx(incremental)
+    assert stats.last_sample == start + timedelta(minutes=5 * 29)
+
+
+def test_compressed_weights_cached_until_history_changes():
+    stats = RideStats(compress=True)
+    start = datetime.now(UTC) - timedelta(hours=1)
+    for i, wait in enumerate([10, 10, 20]):
+        stats.add_wait(wait, start + timedelta(minutes=5 * i))
+    weights = stats._weights()
+    assert stats._weights() is weights
+    stats.add_wait(20, start + timedelta(minutes=15))
+    assert stats._weights() is not weights
+    assert stats.mean() == pytest.approx(15)
+    weights = stats._weights()
+    stats.set_compress(False)
+    assert stats._weights() is not weights
+    stats.history = deque(stats.history)
+    assert stats._weights_cache is None
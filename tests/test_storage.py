@@ -0,0 +1,144 @@
+import asyncio
+import os, sys
+import pytest
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from disneywaits.service import DisneyWaitsService
+from disneywaits.storage import SqliteStorage, Storage
+
+
+class DummyClient:
+    async def fetch_parks(self):
+        return [{"id": 1, "name": "Test Park"}]
+
+    async def fetch_wait_times(self, park_id):
+        return [
+            {"id": 10, "name": "Ride A", "wait_time": 5, "is_open": True},
+            {"id": 11, "name": "Ride B", "wait_time": 0, "is_open": False},
+        ]
+
+
+def test_sqlite_schema(tmp_path: Path):
+    storage = SqliteStorage(tmp_path / "data.db")
+    assert storage.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    columns = [
+        row[2] for row in storage.conn.execute("PRAGMA index_info(waits_ride_time)")
+    ]
+    assert columns == ["ride_id", "timestamp"]
+    storage.close()
+
+
+def test_sqlite_service_round_trip(tmp_path: Path):
+    storage = SqliteStorage(tmp_path / "data.db")
+    service = DisneyWaitsService(DummyClient(), storage=storage)
+    for _ in range(3):
+        asyncio.run(service.update())
+    service.save()
+    assert storage.conn.execute("SELECT COUNT(*) FROM waits").fetchone()[0] == 3
+    storage.close()
+
+    storage = SqliteStorage(tmp_path / "data.db")
+    new_service = DisneyWaitsService(DummyClient(), storage=storage, compress_history=True)
+    new_service.load()
+    waits = new_service.wait_times()
+    assert len(waits) == 2
+    ride_a = next(r for r in waits if r["id"] == "10")
+    assert ride_a["current_wait"] == 5
+    assert ride_a["mean"] == 5
+    stats = new_service.parks["1"].rides["10"].stats
+    assert [(e.wait, e.count) for e in stats.history] == [(5, 3)]
+    storage.close()
+
+
+def test_sqlite_loads_only_live_window(tmp_path: Path):
+    storage = SqliteStorage(tmp_path / "data.db")
+    service = DisneyWaitsService(DummyClient(), storage=storage)
+    asyncio.run(service.update())
+    service.save()
+    now = datetime.now(UTC)
+    old = now - timedelta(days=8)
+    storage.record(
+        [
+            ("1", "Test Park", "10", "Ride A", old, 40),
+            ("1", "Test Park", "10", "Ride A", old + timedelta(hours=1), 45),
+        ]
+    )
+
+    parks = storage.load()
+    history = parks["1"].rides["10"].stats.history
+    assert [e.wait for e in history] == [5]
+
+    archived = storage.history("10", old - timedelta(minutes=1), old + timedelta(days=1))
+    assert [(e.timestamp, e.wait) for e in archived] == [
+        (old, 40),
+        (old + timedelta(hours=1), 45),
+    ]
+    assert storage.history("11", old) == []
+    storage.close()
+
+
+def test_sqlite_reload_without_save(tmp_path: Path):
+    storage = SqliteStorage(tmp_path / "data.db")
+    service = DisneyWaitsService(DummyClient(), storage=storage, detection_mode="hourly")
+    for _ in range(3):
+        asyncio.run(service.update())
+    storage.close()  # simulate a crash: save() never runs
+
+    storage = SqliteStorage(tmp_path / "data.db")
+    new_service = DisneyWaitsService(DummyClient(), storage=storage, detection_mode="hourly")
+    new_service.load()
+    park = new_service.parks["1"]
+    assert park.name == "Test Park"
+    ride = park.rides["10"]
+    assert ride.name == "Ride A"
+    assert ride.stats.detection == "hourly"
+    assert ride.stats.current_wait == 5
+    assert len(ride.stats.history) == 3
+    assert sum(b.weight for b in ride.stats.baseline.values()) == pytest.approx(3)
+    storage.close()
+
+
+def test_sqlite_reload_folds_in_samples_after_save(tmp_path: Path):
+    storage = SqliteStorage(tmp_path / "data.db")
+    service = DisneyWaitsService(DummyClient(), storage=storage)
+    asyncio.run(service.update())
+    service.save()
+    asyncio.run(service.update())
+    asyncio.run(service.update())
+    storage.close()
+
+    storage = SqliteStorage(tmp_path / "data.db")
+    stats = storage.load()["1"].rides["10"].stats
+    assert len(stats.history) == 3
+    assert sum(b.weight for b in stats.baseline.values()) == pytest.approx(3)
+    assert stats.last_sample == stats.history[-1].timestamp
+    storage.close()
+
+
+def test_storage_requires_save_and_load():
+    class Incomplete(Storage):
+        def save(self, parks):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_sqlite_reload_after_save_does_not_double_count(tmp_path: Path):
+    storage = SqliteStorage(tmp_path / "data.db")
+    service = DisneyWaitsService(DummyClient(), storage=storage)
+    for _ in range(2):
+        asyncio.run(service.update())
+    service.save()
+    storage.close()
+
+    storage = SqliteStorage(tmp_path / "data.db")
+    stats = storage.load()["1"].rides["10"].stats
+    assert sum(b.weight for b in stats.baseline.values()) == pytest.approx(2)
+    closed = storage.load()["1"].rides["11"].stats
+    assert closed.is_open is False
+    assert closed.current_wait is None
+    storage.close()
@@ -28,3 +28,34 @@ def test_index_marks_low_waits_bold():
     assert ".low {" in text
     assert "font-weight: bold" in text
     assert "row.classList.add('low')" in text
+
+
+def test_events_resume_id_from_header_or_query(monkeypatch):
+    import pytest
+    from disneywaits import service as service_module
+
+    class Captured(Exception):
+        pass
+
+    def fake_subscribe(ids, last_event_id=None):
+        raise Captured(ids, last_event_id)
+
+    monkeypatch.setattr(service_module.service, "subscribe", fake_subscribe)
+    client = TestClient(app)
+    with pytest.raises(Captured) as info:
+        client.get("/events", params={"ride_ids": "10", "last_event_id": "abc-3"})
+    assert info.value.args == ({"10"}, "abc-3")
+    with pytest.raises(Captured) as info:
+        client.get(
+            "/events",
+            params={"last_event_id": "abc-3"},
+            headers={"Last-Event-ID": "abc-5"},
+        )
+    assert info.value.args == (set(), "abc-5")
+
+
+def test_index_resumes_event_stream():
+    path = Path(__file__).resolve().parent.parent / "disneywaits" / "index.html"
+    text = path.read_text()
+    assert "params.set('last_event_id', lastEventId)" in text
+    assert "rideKey === evtRideKey" in text